@@ -2,6 +2,7 @@
 # Inspect the QMenuBar, actions, and roles without starting the event loop.
 import sys
 from PySide6.QtWidgets import QApplication
+from PySide6.QtGui import QAction
 from main import SimpleMainWindow
 
 app = QApplication(sys.argv)
@@ -11,6 +12,9 @@ try:
 except Exception:
     pass
 
+# Resolve the menuRole accessor once rather than guarding every call.
+_get_role = (lambda a: a.menuRole()) if hasattr(QAction, 'menuRole') else (lambda a: None)
+
 print("platform:", sys.platform)
 print("applicationName:", app.applicationName())
 
@@ -19,10 +23,7 @@ menu_bar = win.menuBar()
 actions = menu_bar.actions()
 print(f"Top-level actions: {len(actions)}")
 for i, a in enumerate(actions):
-    try:
-        role = a.menuRole()
-    except Exception:
-        role = None
+    role = _get_role(a)
     menu = a.menu()
     menu_title = menu.title() if menu is not None else None
     print(f"[{i}] text={a.text()!r}, menu_title={menu_title!r}, is_separator={a.isSeparator()}, role={role}")
@@ -30,10 +31,7 @@ for i, a in enumerate(actions):
     if menu is not None:
         sub = menu.actions()
         for j, sa in enumerate(sub):
-            try:
-                srole = sa.menuRole()
-            except Exception:
-                srole = None
+            srole = _get_role(sa)
             print(f"    - sub[{j}] text={sa.text()!r}, is_separator={sa.isSeparator()}, role={srole}")
 
 # Print the raw window title for inspection
@@ -9,19 +9,72 @@ from PySide6.QtWidgets import (
     QMenuBar, QMenu, QDialog, QDialogButtonBox,
     QSpacerItem, QSizePolicy
 )
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt, QSize, QTimer
 from PySide6.QtCore import QCoreApplication
 from PySide6.QtGui import QAction, QKeySequence
 import os
-import datetime
-import json
-import platform
-import plistlib
-from typing import Optional
+import functools
+import threading
+from pathlib import Path
+from typing import ClassVar, Optional
 
 # Application version used by the smoke test and for diagnostics.
 __version__ = "0.1.0"
 
+# Whether we're running on macOS; checked in several places.
+_IS_MAC = sys.platform == "darwin"
+
+# Qt binding capabilities used by the menu setup. These can't change at
+# runtime, so probe them once here instead of try/except per window.
+_HAS_PREFS_SHORTCUT = hasattr(QKeySequence, 'Preferences')
+_HAS_MENU_ROLES = hasattr(QAction, 'PreferencesRole') and hasattr(QAction, 'QuitRole')
+
+# The user's home directory, resolved once instead of on every path build.
+_HOME = os.path.expanduser("~")
+
+def _atomic_write(path: str, payload: bytes):
+    """Atomically replace ``path`` with ``payload``.
+
+    The bytes go to a sibling temporary file through raw os.write calls
+    (no buffered file object), are fsync'd, and the file is then renamed
+    over the target. The file is created owner read/write only.
+    """
+    tmp = path + '.tmp'
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    try:
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(fd, view):]
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+
+@functools.cache
+def _guess_bundle_identifier() -> Optional[str]:
+    """Try to determine a bundle identifier when running from a .app.
+
+    We try a few best-effort methods: inspect __file__ for a .app
+    ancestor and read its Info.plist CFBundleIdentifier. This is
+    intentionally conservative and does not require PyObjC. The
+    bundle identifier can't change while the process runs, so the
+    result is cached and the filesystem is only probed once.
+    """
+    try:
+        path = os.path.abspath(__file__)
+        # Find the innermost enclosing .app directly in the path string.
+        # Running from source (the common dev case) finds nothing.
+        app_end = path.rfind('.app' + os.sep)
+        if app_end == -1:
+            return None
+        info_plist = os.path.join(path[:app_end + 4], 'Contents', 'Info.plist')
+        import plistlib
+        with open(info_plist, 'rb') as f:
+            data = plistlib.load(f)
+        return data.get('CFBundleIdentifier') or None
+    except Exception:
+        return None
+
 class Preferences:
     """Container for application preferences with plist persistence.
 
@@ -32,112 +85,184 @@ class Preferences:
     When not bundled we fall back to a sensible path under
     ~/Library/Preferences using a stable application identifier.
     """
+    # Resolved plist path shared by all instances; the location only
+    # depends on process-wide state so it is computed once.
+    _cached_path: ClassVar[Optional[str]] = None
+
+    # Shared instance handed out by get_instance().
+    _instance: ClassVar[Optional['Preferences']] = None
+    _lock: ClassVar[threading.Lock] = threading.Lock()
+
+    # Known preferences as (name, type, default). Each value is stored
+    # on the instance as '_' + name and exposed through a property.
+    _SCHEMA: ClassVar[tuple] = (
+        ('feature_a_enabled', bool, True),
+        ('feature_b_enabled', bool, False),
+    )
+
+    # Layout of the persisted plist. save() copies this and fills in the
+    # preference values rather than building the dict from scratch.
+    _TEMPLATE: ClassVar[dict] = {
+        **{name: default for name, _cast, default in _SCHEMA},
+        'version': __version__
+    }
+
     def __init__(self):
-        # Default preference values
-        self.feature_a_enabled = True
-        self.feature_b_enabled = False
+        # Default preference values. These are only replaced by the
+        # persisted values the first time a preference is accessed, so
+        # creating a Preferences object never touches the disk.
+        for name, _cast, default in self._SCHEMA:
+            setattr(self, '_' + name, default)
+        self._loaded = False
+        # Values as last read from / written to disk; None means the
+        # plist hasn't been seen yet, so the next save always writes.
+        self._persisted: Optional[tuple] = None
 
         # Location where preferences will be read/written lazily
         self._prefs_path: Optional[str] = None
+        # Set once save() has made sure the plist's directory exists.
+        self._parent_verified = False
 
-    @staticmethod
-    def _guess_bundle_identifier() -> Optional[str]:
-        """Try to determine a bundle identifier when running from a .app.
+    @classmethod
+    def get_instance(cls) -> 'Preferences':
+        """Return the process-wide Preferences object, creating it once.
 
-        We try a few best-effort methods: inspect __file__ for a .app
-        ancestor and read its Info.plist CFBundleIdentifier. This is
-        intentionally conservative and does not require PyObjC.
+        Every window shares this instance so the plist is parsed at most
+        once. The lock is only taken until the instance exists.
         """
-        try:
-            # Walk up from this file looking for an .app bundle
-            path = os.path.abspath(__file__)
-            parts = path.split(os.sep)
-            for i in range(len(parts) - 1, 0, -1):
-                if parts[i].endswith('.app'):
-                    info_plist = os.path.join(os.sep, *parts[: i + 1], 'Contents', 'Info.plist')
-                    if os.path.exists(info_plist):
-                        try:
-                            with open(info_plist, 'rb') as f:
-                                data = plistlib.load(f)
-                            bid = data.get('CFBundleIdentifier')
-                            if bid:
-                                return bid
-                        except Exception:
-                            return None
-            return None
-        except Exception:
-            return None
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
+    def _ensure_loaded(self):
+        """Load persisted preferences on first access (best-effort)."""
+        if not self._loaded:
+            self.load()
+
+    @property
+    def feature_a_enabled(self) -> bool:
+        self._ensure_loaded()
+        return self._feature_a_enabled
+
+    @feature_a_enabled.setter
+    def feature_a_enabled(self, value: bool):
+        # Load first so a later lazy load can't overwrite this value.
+        self._ensure_loaded()
+        self._feature_a_enabled = value
+
+    @property
+    def feature_b_enabled(self) -> bool:
+        self._ensure_loaded()
+        return self._feature_b_enabled
+
+    @feature_b_enabled.setter
+    def feature_b_enabled(self, value: bool):
+        self._ensure_loaded()
+        self._feature_b_enabled = value
 
     def _prefs_file_path(self) -> str:
         """Return the filesystem path to the plist we'll use for storing prefs."""
         if self._prefs_path:
             return self._prefs_path
+        if Preferences._cached_path:
+            self._prefs_path = Preferences._cached_path
+            return self._prefs_path
+        self._prefs_path = Preferences._cached_path = self._resolve_prefs_file_path()
+        return self._prefs_path
 
+    @staticmethod
+    def _resolve_prefs_file_path() -> str:
+        """Work out where the preferences plist lives (uncached)."""
         # Allow tests or callers to override the prefs file path via an
         # environment variable. This keeps automated tests from writing
         # into the user's real ~/Library area.
         env_override = os.environ.get('THE_EXAMPLE_PREFS_PATH')
         if env_override:
-            self._prefs_path = os.path.expanduser(env_override)
-            return self._prefs_path
+            return os.path.expanduser(env_override)
 
         # Prefer a bundle-id-based path when possible (macOS standard)
         bundle_id = None
-        if sys.platform == 'darwin':
-            bundle_id = self._guess_bundle_identifier()
+        if _IS_MAC:
+            bundle_id = _guess_bundle_identifier()
 
         if bundle_id:
             # If the app is sandboxed its container path would be used
             # by the system; we attempt the container preferences path
             # first, then fall back to ~/Library/Preferences.
-            container_pref = os.path.expanduser(f'~/Library/Containers/{bundle_id}/Data/Library/Preferences/{bundle_id}.plist')
+            container_pref = f'{_HOME}/Library/Containers/{bundle_id}/Data/Library/Preferences/{bundle_id}.plist'
             if os.path.exists(os.path.dirname(container_pref)):
-                self._prefs_path = container_pref
-                return self._prefs_path
+                return container_pref
             # fallback
-            self._prefs_path = os.path.expanduser(f'~/Library/Preferences/{bundle_id}.plist')
-            return self._prefs_path
+            return f'{_HOME}/Library/Preferences/{bundle_id}.plist'
 
         # Generic fallback: use application name to build a stable filename
         app_name = QCoreApplication.applicationName() or 'the-example'
         safe_name = ''.join(c if c.isalnum() or c in '.-_ ' else '_' for c in app_name).strip() or 'the-example'
-        self._prefs_path = os.path.expanduser(f'~/Library/Preferences/{safe_name}.plist')
-        return self._prefs_path
+        return f'{_HOME}/Library/Preferences/{safe_name}.plist'
 
     def load(self):
         """Load preferences from disk. Missing values use defaults."""
+        import plistlib
+        # Mark as loaded up front so a failed read isn't retried on every
+        # attribute access.
+        self._loaded = True
         path = self._prefs_file_path()
         try:
-            if os.path.exists(path):
-                with open(path, 'rb') as f:
-                    data = plistlib.load(f)
-                # Only set known keys to avoid surprising data from other apps
-                self.feature_a_enabled = bool(data.get('feature_a_enabled', self.feature_a_enabled))
-                self.feature_b_enabled = bool(data.get('feature_b_enabled', self.feature_b_enabled))
+            # The plist is tiny, so read it in one go and parse from memory
+            # rather than letting plistlib issue many small reads. A missing
+            # file (nothing saved yet) lands in the except below.
+            data = plistlib.loads(Path(path).read_bytes())
+            # Only set known keys to avoid surprising data from other apps
+            for name, cast, default in self._SCHEMA:
+                setattr(self, '_' + name, cast(data.get(name, default)))
+            self._persisted = self._snapshot()
         except Exception:
             # Loading should never crash the app; fall back to defaults.
             pass
 
+    def _snapshot(self) -> tuple:
+        """Return the current preference values as a comparable tuple."""
+        return tuple(cast(getattr(self, name)) for name, cast, _default in self._SCHEMA)
+
+    def has_unsaved_changes(self) -> bool:
+        """Return True if the values differ from what is on disk."""
+        return self._snapshot() != self._persisted
+
     def save(self):
         """Persist preferences to a plist file (atomic write).
 
         We create parent directories as needed and write atomically
-        by writing to a temporary file then renaming it.
+        by writing to a temporary file then renaming it. Nothing is
+        written when the values match what was last loaded or saved.
         """
+        current = self._snapshot()
+        if current == self._persisted:
+            return
+        import plistlib
         path = self._prefs_file_path()
         try:
-            parent = os.path.dirname(path)
-            os.makedirs(parent, exist_ok=True)
-            tmp = path + '.tmp'
-            data = {
-                'feature_a_enabled': bool(self.feature_a_enabled),
-                'feature_b_enabled': bool(self.feature_b_enabled),
-                'version': __version__
-            }
-            with open(tmp, 'wb') as f:
-                plistlib.dump(data, f)
-            # Atomic replace
-            os.replace(tmp, path)
+            data = self._TEMPLATE.copy()
+            for (name, _cast, _default), value in zip(self._SCHEMA, current):
+                data[name] = value
+            # Write a binary plist: smaller and cheaper to parse than XML.
+            # load() autodetects the format, so existing XML files are
+            # still read and simply get rewritten as binary on next save.
+            payload = plistlib.dumps(data, fmt=plistlib.FMT_BINARY)
+            if not self._parent_verified:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._parent_verified = True
+            try:
+                _atomic_write(path, payload)
+            except FileNotFoundError:
+                # The directory vanished since it was verified; recreate
+                # it and try once more.
+                self._parent_verified = False
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._parent_verified = True
+                _atomic_write(path, payload)
+            self._persisted = current
         except Exception:
             # Don't raise; best-effort persistence only.
             pass
@@ -196,14 +321,31 @@ class SimpleMainWindow(QMainWindow):
     """
     The main window of the application with various UI elements.
     """
+    # Menu shortcuts shared by every window. They're built on first use
+    # (QKeySequence should be created once a QApplication exists) and
+    # then reused instead of re-parsing the strings for each window.
+    _KEY_SEQUENCES: ClassVar[Optional[dict]] = None
+
+    @classmethod
+    def _key_sequences(cls) -> dict:
+        """Return the cached QKeySequence objects for the menu actions."""
+        if cls._KEY_SEQUENCES is None:
+            pref_modifier = Qt.MetaModifier if _IS_MAC else Qt.ControlModifier
+            cls._KEY_SEQUENCES = {
+                'preferences': QKeySequence(Qt.Key.Key_Comma | pref_modifier),
+                'quit': QKeySequence(Qt.Key.Key_Q | Qt.ControlModifier),
+                'undo': QKeySequence("Ctrl+Z"),
+                'redo': QKeySequence("Ctrl+Shift+Z"),
+                'minimize': QKeySequence(Qt.Key.Key_M | Qt.ControlModifier),
+            }
+        return cls._KEY_SEQUENCES
+
     def __init__(self):
         super().__init__()
-        self.preferences = Preferences()
-        # Load persisted preferences on startup (best-effort)
-        try:
-            self.preferences.load()
-        except Exception:
-            pass
+        # Preferences are shared between windows and read from disk
+        # lazily on first access, which happens in the deferred
+        # _update_ui_from_preferences call at the end of __init__.
+        self.preferences = Preferences.get_instance()
 
         # Set the window title and a fixed size. On macOS it's common to
         # have windows that are not resizable for simple demos; remove
@@ -270,8 +412,9 @@ class SimpleMainWindow(QMainWindow):
         # Create menu bar and populate it with actions.
         self._create_menu_bar()
 
-        # Update the UI based on initial preferences.
-        self._update_ui_from_preferences()
+        # Update the UI based on initial preferences once the event loop
+        # is running, so reading the plist stays off the startup path.
+        QTimer.singleShot(0, self._update_ui_from_preferences)
 
     def _create_menu_bar(self):
         """Initializes the menu bar with App, File, Edit, and Window menus."""
@@ -281,35 +424,24 @@ class SimpleMainWindow(QMainWindow):
         # with the correct menu roles into the native application menu
         # (the left-most menu) which removes the default 'python' label and
         # shows the application name set in QApplication.
-        is_mac = sys.platform == "darwin"
-        pref_text = "Settings..." if is_mac else "Preferences..."
-        pref_modifier = Qt.MetaModifier if is_mac else Qt.ControlModifier
+        pref_text = "Settings..." if _IS_MAC else "Preferences..."
+        shortcuts = self._key_sequences()
 
         # Keep the action as an instance attribute to ensure it remains
         # alive and clearly associated with the window.
         self.preferences_action = QAction(pref_text, self)
         # Use the platform-standard Preferences key sequence when available.
-        try:
+        if _HAS_PREFS_SHORTCUT:
             # QKeySequence.Preferences maps to the correct shortcut on macOS (⌘,)
             self.preferences_action.setShortcut(QKeySequence.Preferences)
-        except Exception:
+        else:
             # Fallback: use Ctrl+Comma-like modifier as a portable shortcut
-            self.preferences_action.setShortcut(Qt.Key.Key_Comma | pref_modifier)
+            self.preferences_action.setShortcut(shortcuts['preferences'])
         self.preferences_action.triggered.connect(self._on_preferences_action_triggered)
 
-        # Also register the action at the application level. Some Qt
-        # backends require the action to be added to the QApplication so
-        # it can be relocated into the native application menu on macOS.
-        try:
-            app = QApplication.instance()
-            if app is not None:
-                app.addAction(self.preferences_action)
-        except Exception:
-            pass
-
         # Quit action -- set a role so it goes into the native app menu on macOS
         quit_action = QAction("Quit", self)
-        quit_action.setShortcut(Qt.Key.Key_Q | Qt.ControlModifier)
+        quit_action.setShortcut(shortcuts['quit'])
         quit_action.triggered.connect(self.close)
 
         # On macOS set PreferencesRole so Qt moves the action into the
@@ -318,18 +450,13 @@ class SimpleMainWindow(QMainWindow):
         # When running from a terminal the left-most menu may still show
         # the process name (e.g. 'python3'); creating a proper .app bundle
         # is the robust way to have the OS display the bundle name there.
-        try:
+        if _HAS_MENU_ROLES:
             # Ensure Qt knows this action is the application's Preferences.
             # On macOS this causes the action to be placed into the
             # native application menu (and labeled appropriately, e.g.
             # "Settings…" on Ventura).
             self.preferences_action.setMenuRole(QAction.PreferencesRole)
-        except Exception:
-            pass
-        try:
             quit_action.setMenuRole(QAction.QuitRole)
-        except Exception:
-            pass
 
         # Do not call menu_bar.addMenu for an app menu; instead create the
         # other visible menus and let the OS/Qt place the actions above.
@@ -338,10 +465,10 @@ class SimpleMainWindow(QMainWindow):
         # Edit menu with Undo/Redo placeholders. They are not wired up to
         # any document model here — they're shown to demonstrate menu layout.
         undo_action = QAction("Undo", self)
-        undo_action.setShortcut(QKeySequence("Ctrl+Z"))
+        undo_action.setShortcut(shortcuts['undo'])
         edit_menu.addAction(undo_action)
         redo_action = QAction("Redo", self)
-        redo_action.setShortcut(QKeySequence("Ctrl+Shift+Z"))
+        redo_action.setShortcut(shortcuts['redo'])
         edit_menu.addAction(redo_action)
         # Add Preferences to the Edit menu so Qt can relocate it to the
         # native application menu on macOS when the role is set.
@@ -350,7 +477,7 @@ class SimpleMainWindow(QMainWindow):
         # Window Menu
         window_menu = menu_bar.addMenu("Window")
         minimize_action = QAction("Minimize", self)
-        minimize_action.setShortcut(Qt.Key.Key_M | Qt.ControlModifier)
+        minimize_action.setShortcut(shortcuts['minimize'])
         minimize_action.triggered.connect(self.showMinimized)
         window_menu.addAction(minimize_action)
 
@@ -378,11 +505,13 @@ class SimpleMainWindow(QMainWindow):
         dialog = PreferencesDialog(self.preferences, self)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             self.preferences = dialog.get_preferences()
-            # Persist the updated preferences
-            try:
-                self.preferences.save()
-            except Exception:
-                pass
+            # Persist the updated preferences, skipping the write entirely
+            # when the user accepted without changing anything.
+            if self.preferences.has_unsaved_changes():
+                try:
+                    self.preferences.save()
+                except Exception:
+                    pass
             self._update_ui_from_preferences()
 
     def _update_ui_from_preferences(self):
@@ -411,38 +540,45 @@ class SimpleMainWindow(QMainWindow):
             self.slider.setDisabled(True)
             self.slider_label.setDisabled(True)
 
+def _set_macos_process_name(name: bytes):
+    """Set the process name via libc (setprogname and setproctitle).
+
+    These functions are available on BSD/macOS and are reached through
+    ctypes, which is only imported when this helper actually runs.
+    """
+    try:
+        import ctypes, ctypes.util
+        libc_path = ctypes.util.find_library("c")
+        if libc_path:
+            libc = ctypes.CDLL(libc_path)
+            try:
+                # setprogname(const char*) is available on macOS
+                setprog = libc.setprogname
+                setprog.argtypes = [ctypes.c_char_p]
+                setprog.restype = None
+                setprog(name)
+            except Exception:
+                pass
+            try:
+                # setproctitle allows setting the process title
+                setpt = libc.setproctitle
+                setpt.argtypes = [ctypes.c_char_p]
+                setpt.restype = None
+                setpt(name)
+            except Exception:
+                pass
+    except Exception:
+        # Best-effort only; failures are non-fatal.
+        pass
+
 def main():
     """
     The main function to set up and run the application.
     """
     # Try to set the macOS process name so the system menu shows the app
-    # name instead of the python executable. This uses libc functions
-    # available on BSD/macOS (setprogname and setproctitle) via ctypes.
-    if sys.platform == "darwin":
-        try:
-            import ctypes, ctypes.util
-            libc_path = ctypes.util.find_library("c")
-            if libc_path:
-                libc = ctypes.CDLL(libc_path)
-                try:
-                    # setprogname(const char*) is available on macOS
-                    setprog = libc.setprogname
-                    setprog.argtypes = [ctypes.c_char_p]
-                    setprog.restype = None
-                    setprog(b"The Example")
-                except Exception:
-                    pass
-                try:
-                    # setproctitle allows setting the process title
-                    setpt = libc.setproctitle
-                    setpt.argtypes = [ctypes.c_char_p]
-                    setpt.restype = None
-                    setpt(b"The Example")
-                except Exception:
-                    pass
-        except Exception:
-            # Best-effort only; failures are non-fatal.
-            pass
+    # name instead of the python executable.
+    if _IS_MAC:
+        _set_macos_process_name(b"The Example")
 
     # Create the application instance.
     app = QApplication(sys.argv)
@@ -472,6 +608,12 @@ def main():
     # not provided we fall back to the Desktop for easy manual inspection.
     do_smoke = bool(os.environ.get('THE_EXAMPLE_SMOKE')) or ('--smoke' in sys.argv)
     if do_smoke:
+        # Only the smoke test needs these; keep them off the normal
+        # startup (and debug_menu.py import) path.
+        import datetime
+        import json
+        import platform
+
         # Allow CI to choose the output path. Default to the Desktop for
         # convenience when running locally.
         out_path = os.environ.get('THE_EXAMPLE_SMOKE_OUT') or os.path.expanduser('~/Desktop/the-example-smoke.txt')
@@ -509,34 +651,36 @@ def main():
                 dlg.feature_a_checkbox.setChecked(not dlg.feature_a_checkbox.isChecked())
                 dlg.feature_b_checkbox.setChecked(not dlg.feature_b_checkbox.isChecked())
                 prefs_after = dlg.get_preferences()
-                prefs_ok = (prefs_after.feature_a_enabled == dlg.feature_a_checkbox.isChecked() and prefs_after.feature_b_enabled == dlg.feature_b_checkbox.isChecked())
+                feature_a_after, feature_b_after = prefs_after.feature_a_enabled, prefs_after.feature_b_enabled
+                prefs_ok = (feature_a_after == dlg.feature_a_checkbox.isChecked() and feature_b_after == dlg.feature_b_checkbox.isChecked())
                 # Persist preferences so tests can inspect the plist file.
                 try:
                     prefs_after.save()
                 except Exception:
                     pass
             except Exception:
-                prefs_after = None
+                feature_a_after = feature_b_after = None
                 prefs_ok = False
 
             # Inspect the menu structure to see if a Preferences/Settings
             # role action exists. We collect top-level menus and whether
             # any action has PreferencesRole.
+            # Both are gathered in a single pass over the menu bar.
             menu_bar = window.menuBar()
-            top_level = [a.text() for a in menu_bar.actions() if a.text()]
+            top_level = []
             prefs_role_found = False
             for a in menu_bar.actions():
+                text = a.text()
+                if text:
+                    top_level.append(text)
+                if prefs_role_found:
+                    continue
                 m = a.menu()
                 if m:
-                    for act in m.actions():
-                        try:
-                            if act.menuRole() == QAction.PreferencesRole:
-                                prefs_role_found = True
-                                break
-                        except Exception:
-                            pass
-                if prefs_role_found:
-                    break
+                    try:
+                        prefs_role_found = next((True for act in m.actions() if act.menuRole() == QAction.PreferencesRole), False)
+                    except Exception:
+                        pass
 
             # Build a JSON object with diagnostic and test results.
             # Safely resolve application name and display name; some Qt
@@ -567,14 +711,15 @@ def main():
                 "components": {
                     "text_input": {"value": test_text, "selected": selected, "ok": text_ok},
                     "slider": {"value": 75, "label": slider_label_text, "ok": slider_ok},
-                    "preferences": {"after": {"feature_a": getattr(prefs_after, 'feature_a_enabled', None), "feature_b": getattr(prefs_after, 'feature_b_enabled', None)}, "ok": prefs_ok},
+                    "preferences": {"after": {"feature_a": feature_a_after, "feature_b": feature_b_after}, "ok": prefs_ok},
                     "menu": {"top_level": top_level, "prefs_role_found": prefs_role_found}
                 }
             }
 
             # Write JSON payload to the configured path.
             with open(out_path, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+                json.dump(payload, f, ensure_ascii=False)
+                f.write("\n")
             exit_code = 0
         except Exception as e:
             try:
@@ -585,7 +730,8 @@ def main():
                     "error": repr(e)
                 }
                 with open(out_path, 'a', encoding='utf-8') as f:
-                    f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+                    json.dump(payload, f, ensure_ascii=False)
+                    f.write("\n")
             except Exception:
                 pass
             exit_code = 1
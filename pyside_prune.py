@@ -0,0 +1,270 @@
+"""
+Shared pruning logic for removing large optional PySide6/Qt artifacts from
+a built app bundle. Used by prune_bundle.py (run by hand after a build) and
+by setup.py's opt-in post-build step (PRUNE_BUNDLE=1).
+"""
+import functools
+import os
+import re
+import shutil
+import stat
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+
+# shutil.rmtree renamed its error hook from onerror to onexc in 3.12.
+_RMTREE_HOOK = 'onexc' if sys.version_info >= (3, 12) else 'onerror'
+
+
+def _add_owner_rwx(path) -> bool:
+    """Give the owner full access to directory ``path``.
+
+    Returns True only if the mode had to be changed (and was), so callers
+    can tell whether retrying is worthwhile.
+    """
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+        if mode & stat.S_IRWXU == stat.S_IRWXU:
+            return False
+        os.chmod(path, mode | stat.S_IRWXU)
+        return True
+    except OSError:
+        return False
+
+
+# rmtree callbacks that delete a single entry, and those that open or list
+# a directory so its contents can be deleted.
+_DELETE_FUNCS = frozenset({os.unlink, os.remove, os.rmdir})
+_DIR_OPEN_FUNCS = frozenset({os.open, os.scandir})
+
+
+def _fix_perm_and_retry(func, path, exc):
+    """rmtree error hook: fix directory permissions, then retry.
+
+    Only entries that actually fail to delete pay for the chmod, instead
+    of walking the whole tree up front to fix permissions. A failed
+    unlink/rmdir is retried once its parent is writable; a directory that
+    couldn't be opened or listed is made accessible and removed with a
+    fresh rmtree, as rmtree itself has already skipped it. Anything else,
+    including errors other than PermissionError, is re-raised. Symlinks
+    are never chmod'ed, as that would change the mode of their target.
+    """
+    # onerror passes an exc_info tuple, onexc the exception itself.
+    if isinstance(exc, tuple):
+        exc = exc[1]
+    if not isinstance(exc, PermissionError):
+        raise exc
+    if func in _DELETE_FUNCS:
+        _add_owner_rwx(os.path.dirname(path))
+        func(path)
+    elif func in _DIR_OPEN_FUNCS and not os.path.islink(path) and _add_owner_rwx(path):
+        # Only recurses when the mode actually changed, so this can't loop.
+        shutil.rmtree(path, **{_RMTREE_HOOK: _fix_perm_and_retry})
+    else:
+        raise exc
+
+
+# Trees with at least this many entries are handed to ``rm -rf``; below
+# that the fork/exec costs more than deleting from Python.
+_BULK_RM_MIN_ENTRIES = 50
+
+
+def tree_stats(path) -> tuple:
+    """Return ``(size_in_bytes, entry_count)`` for everything under ``path``.
+
+    Sizes are apparent file sizes read from os.scandir DirEntry objects;
+    symlinks are counted but not followed.
+    """
+    total = 0
+    count = 0
+    stack = [str(path)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    count += 1
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        else:
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    return total, count
+
+
+def _has_at_least(path: Path, n: int) -> bool:
+    """Return True if ``path`` contains ``n`` or more entries (stops early)."""
+    seen = 0
+    for _root, dirs, files in os.walk(path):
+        seen += len(dirs) + len(files)
+        if seen >= n:
+            return True
+    return False
+
+
+def _bulk_rmtree(p: Path) -> bool:
+    """Remove a large tree with a single ``rm -rf``; return True on success.
+
+    On macOS rm deletes recursively in native code, which beats one
+    Python-level scandir/unlink round-trip per file for big frameworks.
+    """
+    try:
+        return subprocess.run(['/bin/rm', '-rf', str(p)], stderr=subprocess.DEVNULL).returncode == 0
+    except OSError:
+        return False
+
+
+def _safe_rmtree(p: Path, measure=False) -> tuple:
+    """Remove a file or directory tree.
+
+    Returns ``(message, bytes_freed)``; nothing is printed here so that
+    concurrent removals can't interleave their output. Files are sized
+    from the lstat that is done anyway. Directory trees are only sized
+    (with a full walk) when ``measure`` is true, and otherwise count as
+    0, so callers that don't report sizes skip the extra pass.
+    """
+    # A single lstat both detects missing paths and tells directories
+    # apart from files; symlinks are unlinked, never followed.
+    try:
+        st = os.lstat(p)
+        if stat.S_ISDIR(st.st_mode):
+            if measure:
+                size, entries = tree_stats(p)
+                bulk = entries >= _BULK_RM_MIN_ENTRIES
+            else:
+                size = 0
+                bulk = _has_at_least(p, _BULK_RM_MIN_ENTRIES)
+            # Anything rm couldn't delete (e.g. permissions) is finished
+            # off by shutil.rmtree and its chmod-and-retry hook.
+            if not (bulk and _bulk_rmtree(p)):
+                shutil.rmtree(p, **{_RMTREE_HOOK: _fix_perm_and_retry})
+            message = f'removed: {p}'
+        else:
+            p.unlink()
+            size = st.st_size
+            message = f'removed file: {p}'
+        return message, size
+    except FileNotFoundError:
+        return f'not present: {p}', 0
+    except Exception as e:
+        return f'failed to remove {p} {e}', 0
+
+
+# Paths (relative to the PySide6 package root) removed at every level:
+# WebEngine, Quick3D, PDF, Designer, developer tools, lrelease/lupdate,
+# the big packaging JSON, and QML/translations/docs/examples.
+MODERATE_TARGETS = (
+    'Qt/lib/QtWebEngineCore.framework',
+    'Qt/lib/QtWebEngineProcess.app',
+    'Qt/lib/QtQuick3DRuntimeRender.framework',
+    'Qt/lib/QtPdf.framework',
+    'Qt/lib/QtDesigner.framework',
+    'Qt/lib/icudtl.dat',
+    'Qt/lib/qtwebengine_devtools_resources.pak',
+    'PySide6_Essentials.json',
+    'lupdate',
+    'lrelease',
+    'qmlls',
+    'qmllint',
+    'qmlformat',
+    'Linguist.app',
+    'Assistant.app',
+    'Designer.app',
+    'balsam',
+    'Qt/qml',
+    'Qt/libexec',
+    'Qt/translations',
+    'Qt/tools',
+    'Qt/examples',
+    'Qt/doc',
+)
+
+# Additionally removed at the 'aggressive' level.
+AGGRESSIVE_TARGETS = (
+    'Qt/lib/QtQml.framework',
+    'Qt/lib/QtQuick.framework',
+)
+
+# Removal criteria applied while walking the PySide6 tree.
+FFMPEG_PREFIXES = ('libavcodec', 'libavformat', 'libavutil', 'libswresample', 'libswscale')
+BIG_DIR_PREFIXES = ('QtWebEngineCore', 'QtQuick3D', 'QtPdf', 'QtDesigner')
+# One anchored pattern for "<ffmpeg prefix>...dylib" file names.
+FFMPEG_RE = re.compile(r'(?:%s).*\.dylib\Z' % '|'.join(map(re.escape, FFMPEG_PREFIXES)))
+
+
+def _find_walk_targets(root: Path, skip=frozenset()):
+    """Return heavy Qt directories and ffmpeg dylibs anywhere under ``root``.
+
+    Everything is matched in one depth-first os.scandir pass that works on
+    the DirEntry names; a Path is only built for entries that match.
+    Matched directories, and any directory in ``skip`` (already scheduled
+    for removal), are not descended into.
+    """
+    targets = []
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    name = entry.name
+                    if entry.is_dir():
+                        if entry.path in skip:
+                            continue
+                        if name.startswith(BIG_DIR_PREFIXES):
+                            targets.append(Path(entry.path))
+                        elif not entry.is_symlink():
+                            stack.append(entry.path)
+                    elif FFMPEG_RE.match(name):
+                        targets.append(Path(entry.path))
+        except OSError:
+            pass
+    return targets
+
+
+def _outermost(paths):
+    """Return ``paths`` without duplicates or entries nested in another one.
+
+    This guarantees that no two concurrent removals touch the same tree.
+    """
+    # A set lookup per ancestor replaces sorting the targets by depth;
+    # removal order doesn't matter as the kept trees are disjoint.
+    unique = set(paths)
+    return [path for path in unique if unique.isdisjoint(path.parents)]
+
+
+def _remove_all(paths, measure=False, max_workers=8) -> int:
+    """Remove independent paths concurrently; return the bytes freed.
+
+    Each target's status line is printed from the calling thread, one
+    line per target, in the order the targets were scheduled.
+    """
+    remove = functools.partial(_safe_rmtree, measure=measure)
+    freed = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        for message, size in ex.map(remove, _outermost(paths)):
+            print(message)
+            freed += size
+    return freed
+
+
+def prune_pyside(pyside_root, level='moderate', measure=False) -> int:
+    """Remove optional PySide6/Qt artifacts under ``pyside_root``.
+
+    ``level`` is 'moderate' (default) or 'aggressive'; the latter also
+    drops the QtQml/QtQuick frameworks. All targets are gathered into one
+    deduplicated list (fixed paths plus a single walk for nested copies
+    and ffmpeg libs) and then removed on a small thread pool. Returns
+    the number of bytes freed; pass ``measure=True`` to have directory
+    trees sized before removal, otherwise only files are counted.
+    """
+    pyside_root = Path(pyside_root)
+    rel = MODERATE_TARGETS + (AGGRESSIVE_TARGETS if level == 'aggressive' else ())
+    targets = [pyside_root / r for r in rel]
+    skip = frozenset(str(t) for t in targets)
+    targets += _find_walk_targets(pyside_root, skip)
+    return _remove_all(targets, measure)
@@ -1,7 +1,6 @@
 from setuptools import setup
 import os
 import sys
-import glob
 import sysconfig
 
 # Temporary pre-build cleanup: setuptools bundles a _vendor directory that
@@ -15,16 +14,24 @@ try:
     import setuptools as _setuptools
     vendor_dir = os.path.join(os.path.dirname(_setuptools.__file__), '_vendor')
     if os.path.isdir(vendor_dir):
-        site_packages = sysconfig.get_paths().get('purelib') or sysconfig.get_paths().get('platlib')
+        paths = sysconfig.get_paths()
+        site_packages = paths.get('purelib') or paths.get('platlib')
         if site_packages and os.path.isdir(site_packages):
+            # Index site-packages .dist-info names by package name once,
+            # rather than re-globbing site-packages for every vendor entry.
+            site_dists = set()
+            with os.scandir(site_packages) as it:
+                for entry in it:
+                    if entry.name.endswith('.dist-info'):
+                        site_dists.add(entry.name.split('-', 1)[0])
+            with os.scandir(vendor_dir) as it:
+                vendor_dists = [entry.path for entry in it if entry.name.endswith('.dist-info')]
             # For each .dist-info in the vendor directory, if a same-named
             # package exists in site-packages, hide the vendor copy.
-            for vendor_dist in glob.glob(os.path.join(vendor_dir, '*.dist-info')):
-                base = os.path.basename(vendor_dist)
+            for vendor_dist in vendor_dists:
                 # crude package name extraction: text before first '-' (works for common distributions)
-                pkg_name = base.split('-')[0]
-                matching = glob.glob(os.path.join(site_packages, f"{pkg_name}-*.dist-info"))
-                if matching:
+                pkg_name = os.path.basename(vendor_dist).split('-', 1)[0]
+                if pkg_name in site_dists:
                     new_name = vendor_dist + '.hide'
                     try:
                         os.rename(vendor_dist, new_name)
@@ -45,18 +52,41 @@ DATA_FILES = []
 # pick the first lib that contains that symbol. Fall back to the
 # sys.prefix libffi or the first existing candidate if none contain
 # the symbol.
+_nm_longdouble_cache = {}
+
 def _lib_exports_longdouble(path):
-    # Use nm to check exported symbols; be tolerant of failures.
+    # Use nm to check exported symbols; be tolerant of failures. Results
+    # are cached by (realpath, mtime) so candidates that are symlinks to
+    # the same dylib (common with Homebrew) only spawn nm once. We don't
+    # dlopen the library via ctypes instead: dyld may hand back an
+    # already-loaded libffi and answer for the wrong file.
     try:
-        import subprocess
-        out = subprocess.check_output(['nm', '-gU', path], stderr=subprocess.DEVNULL, text=True)
-        return 'ffi_type_longdouble' in out
-    except Exception:
+        real = os.path.realpath(path)
+        key = (real, os.stat(real).st_mtime_ns)
+    except OSError:
         return False
+    if key not in _nm_longdouble_cache:
+        found = False
+        try:
+            import subprocess
+            # Stream the symbol table as raw bytes and stop at the first
+            # hit instead of buffering and decoding nm's whole output.
+            proc = subprocess.Popen(['nm', '-gU', real], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+            with proc:
+                for line in proc.stdout:
+                    if b'ffi_type_longdouble' in line:
+                        found = True
+                        proc.terminate()
+                        break
+        except Exception:
+            pass
+        _nm_longdouble_cache[key] = found
+    return _nm_longdouble_cache[key]
 
 # candidate paths to try (ordered); include some common places
+prefix_libffi = os.path.join(sys.prefix, 'lib', 'libffi.8.dylib')
 candidate_paths = [
-    os.path.join(sys.prefix, 'lib', 'libffi.8.dylib'),
+    prefix_libffi,
     '/Users/mabino/homebrew/Caskroom/miniconda/base/envs/macapp/lib/libffi.8.dylib',
     '/Users/mabino/homebrew/Caskroom/miniconda/base/lib/libffi.8.dylib',
     '/opt/homebrew/opt/libffi/lib/libffi.8.dylib',
@@ -64,25 +94,18 @@ candidate_paths = [
 ]
 
 frameworks = []
-chosen = None
+# Stat each candidate once; only the survivors get the (cached) nm probe.
+existing = [p for p in candidate_paths if os.path.exists(p)]
 # First prefer any candidate that both exists and exports the longdouble symbol.
-for p in candidate_paths:
-    if os.path.exists(p) and _lib_exports_longdouble(p):
-        chosen = p
-        break
+chosen = next((p for p in existing if _lib_exports_longdouble(p)), None)
 
 # If none exported the symbol, prefer sys.prefix if it exists.
-if not chosen:
-    spath = os.path.join(sys.prefix, 'lib', 'libffi.8.dylib')
-    if os.path.exists(spath):
-        chosen = spath
+if not chosen and prefix_libffi in existing:
+    chosen = prefix_libffi
 
 # Otherwise fall back to the first existing candidate.
-if not chosen:
-    for p in candidate_paths:
-        if os.path.exists(p):
-            chosen = p
-            break
+if not chosen and existing:
+    chosen = existing[0]
 
 if chosen:
     frameworks.append(chosen)
@@ -114,6 +137,54 @@ for dylib in pyside_dylibs + qt_dylibs:
     else:
         print(f'Warning: required dylib not found: {dylib}')
 
+# Exclude setuptools' bundled "_vendor" packages. setuptools vendores
+# copies of many libraries (including autocommand, more_itertools, etc.)
+# which can collide with the real packages in site-packages and cause
+# "File exists" errors during py2app's collection step. Excluding the
+# vendored namespace ensures only the real installed packages are bundled.
+# Exclude vendored setuptools._vendor packages AND optional, heavy
+# PySide6/Qt subsystems which are not required by this tiny demo.
+# NOTE: earlier versions accidentally defined 'excludes' twice which
+# caused the first list to be overwritten — merge them here.
+# Excluding a package also excludes its submodules, so no 'X.*' twins are
+# needed; the set literal deduplicates the list once, at import time.
+EXCLUDES = sorted({
+    # setuptools vendored packages (avoid .dist-info collisions)
+    'setuptools._vendor',
+    'setuptools._vendor.autocommand',
+    'setuptools._vendor.more_itertools',
+    'setuptools._vendor.jaraco',
+    'setuptools._vendor.jaraco.text',
+    'setuptools._vendor.jaraco.context',
+    'setuptools._vendor.jaraco.functools',
+    'setuptools._vendor.packaging',
+    'setuptools._vendor.typing_extensions',
+    'setuptools._vendor.inflect',
+    'setuptools._vendor.zipp',
+    'setuptools._vendor.wheel',
+    'setuptools._vendor.platformdirs',
+    'setuptools._vendor.tomli',
+    'setuptools._vendor.importlib_metadata',
+    'setuptools._vendor.backports',
+    'setuptools._vendor.typeguard',
+
+    # Large optional PySide6 subsystems (remove if unused)
+    'PySide6.QtWebEngineCore',
+    'PySide6.QtWebEngineWidgets',
+    'PySide6.QtWebEngine',
+    'PySide6.QtQuick3D',
+    'PySide6.QtPdf',
+    'PySide6.QtDesigner',
+    'PySide6.phonon',
+    'PySide6.QtMultimedia',
+    'PySide6.QtMultimediaWidgets',
+    # Also exclude translation/build tools and developer binaries
+    'PySide6.lupdate',
+    'PySide6.lrelease',
+    'PySide6.Linguist',
+    'PySide6.tools',
+})
+
 OPTIONS = {
     'argv_emulation': True,
     'iconfile': None,
@@ -128,56 +199,7 @@ OPTIONS = {
         'autocommand',
         'more_itertools',
     ],
-    # Exclude setuptools' bundled "_vendor" packages. setuptools vendores
-    # copies of many libraries (including autocommand, more_itertools, etc.)
-    # which can collide with the real packages in site-packages and cause
-    # "File exists" errors during py2app's collection step. Excluding the
-    # vendored namespace ensures only the real installed packages are bundled.
-    # Exclude vendored setuptools._vendor packages AND optional, heavy
-    # PySide6/Qt subsystems which are not required by this tiny demo.
-    # NOTE: earlier versions accidentally defined 'excludes' twice which
-    # caused the first list to be overwritten — merge them here.
-    'excludes': [
-        # setuptools vendored packages (avoid .dist-info collisions)
-        'setuptools._vendor',
-        'setuptools._vendor.autocommand',
-        'setuptools._vendor.more_itertools',
-        'setuptools._vendor.jaraco',
-        'setuptools._vendor.jaraco.text',
-        'setuptools._vendor.jaraco.context',
-        'setuptools._vendor.jaraco.functools',
-        'setuptools._vendor.packaging',
-        'setuptools._vendor.typing_extensions',
-        'setuptools._vendor.inflect',
-        'setuptools._vendor.zipp',
-        'setuptools._vendor.wheel',
-        'setuptools._vendor.platformdirs',
-        'setuptools._vendor.tomli',
-        'setuptools._vendor.importlib_metadata',
-        'setuptools._vendor.backports',
-        'setuptools._vendor.typeguard',
-
-        # Large optional PySide6 subsystems (remove if unused)
-        'PySide6.QtWebEngineCore',
-        'PySide6.QtWebEngineWidgets',
-        'PySide6.QtWebEngine',
-        'PySide6.QtQuick3D',
-        'PySide6.QtQuick3D.*',
-        'PySide6.QtPdf',
-        'PySide6.QtDesigner',
-        'PySide6.phonon',
-        'PySide6.QtMultimedia',
-        'PySide6.QtMultimediaWidgets',
-        'PySide6.QtWebEngineCore.*',
-        'PySide6.QtWebEngineWidgets.*',
-        'PySide6.QtWebEngine.*',
-        # Also exclude translation/build tools and developer binaries
-        'PySide6.lupdate',
-        'PySide6.lrelease',
-        'PySide6.Linguist',
-        'PySide6.Linguist.*',
-        'PySide6.tools',
-    ],
+    'excludes': EXCLUDES,
     'plist': {
         'CFBundleName': 'The Example',
         'CFBundleDisplayName': 'The Example',
@@ -240,132 +262,27 @@ except Exception:
 # This helps reduce the .app size for minimal apps that don't use
 # WebEngine/Quick3D/PDF. Keep this best-effort and don't error if the
 # files are missing.
-try:
-    import shutil
-
-    def _safe_rmtree(path):
-        try:
-            if os.path.exists(path):
-                shutil.rmtree(path)
-                print(f'removed: {path}')
-        except Exception:
-            pass
-
+def _post_build(prune_level):
     dist_root = os.path.join('dist', 'The Example.app', 'Contents', 'Resources')
     # Common PySide6/Qt locations inside the app bundle
     qlib = os.path.join(dist_root, 'lib', 'python3.13', 'PySide6', 'Qt', 'lib')
-    # Pruning is opt-in. Control via PRUNE_BUNDLE and PRUNE_LEVEL env vars.
-    # PRUNE_BUNDLE (truthy) enables pruning. PRUNE_LEVEL controls how
-    # aggressive it is: 'moderate' (default) or 'aggressive'.
-    prune_flag = os.environ.get('PRUNE_BUNDLE', '')
-    prune_enabled = prune_flag.lower() in ('1', 'true', 'yes')
-    prune_level = os.environ.get('PRUNE_LEVEL', 'moderate').lower()
-    if os.path.isdir(qlib) and prune_enabled:
-        print(f'PRUNE_BUNDLE enabled (level={prune_level}): running post-build pruning')
-    elif os.path.isdir(qlib):
-        print('PRUNE_BUNDLE not set: skipping post-build pruning')
-    if os.path.isdir(qlib) and prune_enabled:
-        # Remove WebEngine which is the biggest offender for size
-        _safe_rmtree(os.path.join(qlib, 'QtWebEngineCore.framework'))
-        _safe_rmtree(os.path.join(qlib, 'QtWebEngineProcess.app'))
-        # Optional 3D runtime
-        _safe_rmtree(os.path.join(qlib, 'QtQuick3DRuntimeRender.framework'))
-        # PDF/Designer/other heavy modules
-        _safe_rmtree(os.path.join(qlib, 'QtPdf.framework'))
-        _safe_rmtree(os.path.join(qlib, 'QtDesigner.framework'))
-        # Also try to remove any additional copies or nested layouts
-        # Walk the tree and aggressively remove known large offenders.
-        for root, dirs, files in os.walk(qlib):
-            for d in list(dirs):
-                if any(x in d for x in ('QtWebEngineCore', 'QtQuick3D', 'QtPdf', 'QtDesigner')):
-                    target = os.path.join(root, d)
-                    try:
-                        # try to make files writable before removing (some shipped
-                        # files may be read-only and block rmtree)
-                        for subroot, subdirs, subfiles in os.walk(target):
-                            for f in subfiles:
-                                fp = os.path.join(subroot, f)
-                                try:
-                                    os.chmod(fp, 0o644)
-                                except Exception:
-                                    pass
-                        _safe_rmtree(target)
-                        # reflect change in the dirs list so walk doesn't recuse
-                        dirs.remove(d)
-                    except Exception:
-                        pass
-        # Remove some common large files used by WebEngine that may still be present
-        maybe_files = [
-            os.path.join(qlib, '..', 'PySide6', 'Qt', 'lib', 'icudtl.dat'),
-            os.path.join(qlib, '..', 'PySide6', 'Qt', 'lib', 'qtwebengine_devtools_resources.pak'),
-        ]
-        for mf in maybe_files:
-            try:
-                if os.path.exists(mf):
-                    os.remove(mf)
-                    print(f'removed file: {mf}')
-            except Exception:
-                pass
-        # Remove large PySide6 packaging/metadata and developer binaries
-        extras_files = [
-            os.path.join(qlib, '..', 'PySide6', 'PySide6_Essentials.json'),
-            os.path.join(qlib, '..', 'PySide6', 'lrelease'),
-            os.path.join(qlib, '..', 'PySide6', 'lupdate'),
-            os.path.join(qlib, '..', 'PySide6', 'qmlls'),
-            os.path.join(qlib, '..', 'PySide6', 'qmllint'),
-            os.path.join(qlib, '..', 'PySide6', 'qmlformat'),
-        ]
-        for ef in extras_files:
-            try:
-                if os.path.exists(ef):
-                    if os.path.isdir(ef):
-                        shutil.rmtree(ef)
-                        print(f'removed: {ef}')
-                    else:
-                        os.remove(ef)
-                        print(f'removed file: {ef}')
-            except Exception:
-                pass
-        # compute the PySide6 top directory inside the bundle reliably
-        # qlib points to .../PySide6/Qt/lib, so stepping two levels up gives
-        # the PySide6 root directory.
-        pyside_root = os.path.normpath(os.path.join(qlib, '..', '..'))
+    if not os.path.isdir(qlib):
+        return
+    print(f'PRUNE_BUNDLE enabled (level={prune_level}): running post-build pruning')
+    # The removal list and logic are shared with prune_bundle.py.
+    # qlib points to .../PySide6/Qt/lib, so stepping two levels up
+    # gives the PySide6 root directory.
+    from pyside_prune import prune_pyside
+    prune_pyside(os.path.normpath(os.path.join(qlib, '..', '..')), prune_level)
 
-        extras = [
-            os.path.join(pyside_root, 'lupdate'),
-            os.path.join(pyside_root, 'lrelease'),
-            os.path.join(pyside_root, 'Linguist.app'),
-            os.path.join(pyside_root, 'Assistant.app'),
-            os.path.join(pyside_root, 'Designer.app'),
-            # QML and qml plugins (safe to remove for non-QML apps)
-            os.path.join(pyside_root, 'Qt', 'qml'),
-            os.path.join(pyside_root, 'Qt', 'libexec'),
-            os.path.join(pyside_root, 'Qt', 'translations'),
-            os.path.join(pyside_root, 'Qt', 'tools'),
-            os.path.join(pyside_root, 'Qt', 'examples'),
-            os.path.join(pyside_root, 'Qt', 'doc'),
-            os.path.join(pyside_root, 'balsam'),
-        ]
-
-        for target in extras:
-            _safe_rmtree(target)
-
-        # Remove ffmpeg/av libraries bundled by Qt (not needed for simple widgets apps)
-        ffmpeg_like = ('libavcodec', 'libavformat', 'libavutil', 'libswresample', 'libswscale')
-        for root, dirs, files in os.walk(qlib):
-            for f in list(files):
-                if any(f.startswith(name) and f.endswith('.dylib') for name in ffmpeg_like):
-                    _safe_rmtree(os.path.join(root, f))
-
-        # Moderate vs aggressive pruning:
-        # - moderate: remove WebEngine, Quick3D, PDF, Designer, developer tools,
-        #             lrelease/lupdate, ffmpeg libs, big packaging JSON, and QML examples
-        # - aggressive: additionally remove QtQml/QtQuick frameworks and many plugins
-        if prune_level == 'aggressive':
-            # remove QtQml and QtQuick frameworks and their plugins
-            _safe_rmtree(os.path.join(qlib, '..', 'PySide6', 'Qt', 'lib', 'QtQml.framework'))
-            _safe_rmtree(os.path.join(qlib, '..', 'PySide6', 'Qt', 'lib', 'QtQuick.framework'))
-            # remove qml plugins (many are safe to remove for pure widgets apps)
-            _safe_rmtree(os.path.join(pyside_root, 'Qt', 'qml'))
-except Exception:
-    pass
+# Pruning is opt-in. Control via PRUNE_BUNDLE and PRUNE_LEVEL env vars.
+# PRUNE_BUNDLE (truthy) enables pruning. PRUNE_LEVEL controls how
+# aggressive it is: 'moderate' (default) or 'aggressive'. The flag is
+# checked before touching the filesystem at all.
+if os.environ.get('PRUNE_BUNDLE', '').lower() in ('1', 'true', 'yes'):
+    try:
+        _post_build(os.environ.get('PRUNE_LEVEL', 'moderate').lower())
+    except Exception:
+        pass
+elif 'py2app' in sys.argv:
+    print('PRUNE_BUNDLE not set: skipping post-build pruning')
@@ -0,0 +1,93 @@
+import os
+import plistlib
+import shutil
+import sys
+
+import pytest
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_root)
+
+from main import Preferences  # noqa: E402
+
+
+@pytest.fixture
+def prefs_path(tmp_path, monkeypatch):
+    """Point the preferences at a plist under tmp_path with fresh caches."""
+    path = tmp_path / 'prefs' / 'the-example-test.plist'
+    monkeypatch.setenv('THE_EXAMPLE_PREFS_PATH', str(path))
+    monkeypatch.setattr(Preferences, '_cached_path', None)
+    monkeypatch.setattr(Preferences, '_instance', None)
+    return path
+
+
+def _write_plist(path, data, fmt=plistlib.FMT_XML):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(plistlib.dumps(data, fmt=fmt))
+
+
+def test_loads_lazily_on_first_access(prefs_path):
+    """Creating Preferences doesn't read the plist; the first property does.
+
+    The existing file is XML, which must still be understood now that
+    saves write binary plists.
+    """
+    _write_plist(prefs_path, {'feature_a_enabled': False, 'feature_b_enabled': True})
+
+    prefs = Preferences()
+    assert not prefs._loaded
+
+    assert prefs.feature_a_enabled is False
+    assert prefs._loaded
+    assert prefs.feature_b_enabled is True
+    assert not prefs.has_unsaved_changes()
+
+
+def test_get_instance_returns_one_unloaded_object(prefs_path):
+    """get_instance() hands out a single shared object without loading it."""
+    first = Preferences.get_instance()
+    assert Preferences.get_instance() is first
+    assert not first._loaded
+
+
+def test_save_writes_binary_plist(prefs_path):
+    """save() creates the directory and writes a binary plist."""
+    prefs = Preferences()
+    prefs.feature_b_enabled = True
+    prefs.save()
+
+    raw = prefs_path.read_bytes()
+    assert raw.startswith(b'bplist00')
+    data = plistlib.loads(raw)
+    assert data['feature_a_enabled'] is True
+    assert data['feature_b_enabled'] is True
+    assert 'version' in data
+
+
+def test_save_skips_unchanged_values(prefs_path):
+    """Nothing is written when the values match what was loaded."""
+    _write_plist(prefs_path, {'feature_a_enabled': True, 'feature_b_enabled': False})
+    prefs = Preferences()
+    prefs.feature_a_enabled = True
+    # Remove the file: if save() wrote anything it would reappear.
+    prefs_path.unlink()
+
+    prefs.save()
+
+    assert not prefs_path.exists()
+
+
+def test_save_recreates_removed_directory(prefs_path):
+    """Saving still works after the prefs directory is deleted mid-session."""
+    prefs = Preferences()
+    prefs.feature_a_enabled = False
+    prefs.save()
+    assert prefs_path.exists()
+
+    shutil.rmtree(prefs_path.parent)
+    prefs.feature_b_enabled = True
+    prefs.save()
+
+    data = plistlib.loads(prefs_path.read_bytes())
+    assert data['feature_a_enabled'] is False
+    assert data['feature_b_enabled'] is True
@@ -0,0 +1,153 @@
+import os
+import stat
+import sys
+
+import pytest
+
+repo_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repo_root)
+
+from pyside_prune import _fix_perm_and_retry, prune_pyside  # noqa: E402
+
+
+def _write(path, size):
+    """Create ``path`` (and its parents) holding ``size`` bytes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'x' * size)
+    return size
+
+
+def _build_tree(tmp_path):
+    """Build a small fake PySide6 package plus a directory outside it.
+
+    Returns ``(pyside_root, outside_dir, expected_bytes_freed)``.
+    """
+    root = tmp_path / 'PySide6'
+    outside = tmp_path / 'outside'
+    freed = 0
+
+    # Files that must survive any pruning.
+    _write(root / 'Qt' / 'lib' / 'QtCore.framework' / 'QtCore', 100)
+    _write(root / 'Qt' / 'plugins' / 'platforms' / 'libqcocoa.dylib', 100)
+    _write(root / 'libfoo.dylib', 100)
+    _write(root / 'Qt' / 'lib' / 'QtQml.framework' / 'QtQml', 100)
+
+    # Fixed targets that are present: a small tree, a big tree (handed
+    # to rm -rf), a single file and a framework.
+    freed += _write(root / 'Qt' / 'translations' / 'qt_de.qm', 10)
+    for i in range(60):
+        freed += _write(root / 'Qt' / 'qml' / f'mod{i}' / 'qmldir', 1)
+    freed += _write(root / 'lupdate', 20)
+    freed += _write(root / 'Qt' / 'lib' / 'QtPdf.framework' / 'QtPdf', 30)
+
+    # Found by the walk: a nested QtPdf framework and an ffmpeg dylib.
+    freed += _write(root / 'Qt' / 'plugins' / 'x' / 'QtPdfQuick.framework' / 'QtPdfQuick', 40)
+    freed += _write(root / 'Qt' / 'plugins' / 'multimedia' / 'libavcodec.61.dylib', 50)
+
+    # A fixed target containing a directory we may not write to. Note
+    # that root ignores this; see test_prune_pyside_unreadable_directories.
+    locked = root / 'Qt' / 'doc' / 'locked'
+    freed += _write(locked / 'index.html', 60)
+    os.chmod(locked, 0o500)
+
+    # Symlinks out of the tree: one matching a target name, one not.
+    # Neither the link targets nor their contents may be touched.
+    _write(outside / 'QtPdf', 70)
+    _write(outside / 'libavutil.59.dylib', 70)
+    os.chmod(outside, 0o700)
+    pdf_link = root / 'Qt' / 'lib' / 'QtPdfLink.framework'
+    pdf_link.symlink_to(outside, target_is_directory=True)
+    freed += os.lstat(pdf_link).st_size
+    (root / 'Qt' / 'external').symlink_to(outside, target_is_directory=True)
+
+    return root, outside, freed
+
+
+def test_prune_pyside_moderate(tmp_path):
+    """Prune a synthetic PySide6 tree and check what is left on disk.
+
+    Present and missing fixed targets, walk-found targets, a directory
+    that needs a chmod before it can be removed and symlinks pointing
+    outside the tree are all covered; the reported byte count must match
+    what was actually deleted.
+    """
+    root, outside, expected = _build_tree(tmp_path)
+
+    freed = prune_pyside(root, 'moderate', measure=True)
+
+    assert freed == expected
+    for gone in ('Qt/translations', 'Qt/qml', 'lupdate', 'Qt/lib/QtPdf.framework',
+                 'Qt/plugins/x/QtPdfQuick.framework',
+                 'Qt/plugins/multimedia/libavcodec.61.dylib', 'Qt/doc',
+                 'Qt/lib/QtPdfLink.framework'):
+        assert not os.path.lexists(root / gone), gone
+    for kept in ('Qt/lib/QtCore.framework/QtCore', 'Qt/plugins/platforms/libqcocoa.dylib',
+                 'libfoo.dylib', 'Qt/lib/QtQml.framework/QtQml', 'Qt/external'):
+        assert os.path.lexists(root / kept), kept
+
+    # Nothing behind the symlinks was removed or had its mode changed.
+    assert (outside / 'QtPdf').exists()
+    assert (outside / 'libavutil.59.dylib').exists()
+    assert stat.S_IMODE(os.stat(outside).st_mode) == 0o700
+
+
+def test_prune_pyside_aggressive_without_measure(tmp_path):
+    """Without ``measure`` only removed files count towards the total."""
+    root, outside, _expected = _build_tree(tmp_path)
+    link_size = os.lstat(root / 'Qt' / 'lib' / 'QtPdfLink.framework').st_size
+
+    freed = prune_pyside(root, 'aggressive')
+
+    # lupdate, the ffmpeg dylib and the symlink are the only non-directory
+    # targets removed.
+    assert freed == 20 + 50 + link_size
+    assert not (root / 'Qt' / 'lib' / 'QtQml.framework').exists()
+    assert (root / 'Qt' / 'lib' / 'QtCore.framework' / 'QtCore').exists()
+    assert stat.S_IMODE(os.stat(outside).st_mode) == 0o700
+
+
+@pytest.mark.skipif(os.geteuid() == 0, reason='root bypasses permission checks')
+def test_prune_pyside_unreadable_directories(tmp_path):
+    """Targets holding unreadable or read-only directories are removed."""
+    root = tmp_path / 'PySide6'
+    unreadable = root / 'Qt' / 'doc' / 'html' / 'unreadable'
+    _write(unreadable / 'index.html', 10)
+    read_only = root / 'Qt' / 'translations' / 'read-only'
+    _write(read_only / 'qt_de.qm', 10)
+    os.chmod(unreadable, 0)
+    os.chmod(read_only, 0o500)
+
+    prune_pyside(root)
+
+    assert not (root / 'Qt' / 'doc').exists()
+    assert not (root / 'Qt' / 'translations').exists()
+
+
+def test_fix_perm_and_retry_reopens_unreadable_directory(tmp_path):
+    """A directory rmtree couldn't open is made accessible and removed.
+
+    The hook is called directly, so this also runs as root.
+    """
+    locked = tmp_path / 'locked'
+    _write(locked / 'sub' / 'file', 10)
+    os.chmod(locked, 0)
+
+    _fix_perm_and_retry(os.open, str(locked), PermissionError())
+
+    assert not locked.exists()
+
+
+def test_fix_perm_and_retry_reraises_other_errors(tmp_path):
+    """Only PermissionError is handled; a symlink is never chmod'ed."""
+    target = tmp_path / 'target'
+    target.mkdir(mode=0o700)
+    link = tmp_path / 'link'
+    link.symlink_to(target, target_is_directory=True)
+
+    with pytest.raises(OSError):
+        _fix_perm_and_retry(os.path.islink, str(link), OSError('symlink'))
+    with pytest.raises(PermissionError):
+        _fix_perm_and_retry(os.scandir, str(link), PermissionError())
+
+    assert stat.S_IMODE(os.stat(target).st_mode) == 0o700
+    assert os.path.islink(link)